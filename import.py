@@ -1,9 +1,8 @@
 #!/bin/env python3
 
 import argparse
-from collections import namedtuple
-from enum import Enum
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
 import logging
 import os
 from pathlib import Path
@@ -14,6 +13,9 @@ import tempfile
 import time
 
 DOCKER_BIN = os.environ.get("DOCKER", "docker")
+# Bind mounted into the prometheus container, see docker-compose.yml
+STAGING_DIR = Path(__file__).absolute().parent / "import_staging"
+CONTAINER_STAGING_DIR = "/import_staging"
 METRICS = [
     "cgroup",
     "disk",
@@ -85,11 +87,11 @@ def dump(source, category, begin, end, outfile):
 
 
 def ingest(metrics_file):
-    """Ingest metrics into prometheus"""
-    subprocess.run(
-        [DOCKER_BIN, "compose", "cp", metrics_file, "prometheus:/import.txt"],
-        check=True,
-    )
+    """Ingest metrics into prometheus
+
+    `metrics_file` must live in STAGING_DIR so it is visible to the container.
+    """
+    container_file = f"{CONTAINER_STAGING_DIR}/{Path(metrics_file).name}"
     subprocess.run(
         [
             DOCKER_BIN,
@@ -100,7 +102,7 @@ def ingest(metrics_file):
             "tsdb",
             "create-blocks-from",
             "openmetrics",
-            "/import.txt",
+            container_file,
             "/prometheus",
         ],
         check=True,
@@ -113,12 +115,21 @@ def restart_prometheus():
 
 def do_import(begin, end, source):
     logging.info(f"Importing {source} from '{begin}' to '{end}'")
-    for category in METRICS:
-        with tempfile.NamedTemporaryFile(mode="w") as f:
-            data = dump(source, category, begin, end, f)
-            # Need to chmod b/c there's a uid/gid mismatch when copying into container
-            os.chmod(f.name, 0o644)
-            ingest(f.name)
+    with ExitStack() as stack, ThreadPoolExecutor(len(METRICS)) as executor:
+        # Categories are independent so dump them concurrently. Ingestion
+        # stays serial on this thread since it writes into the same TSDB.
+        futures = {}
+        for category in METRICS:
+            f = stack.enter_context(
+                tempfile.NamedTemporaryFile(mode="wb", dir=STAGING_DIR)
+            )
+            # Need to chmod b/c there's a uid/gid mismatch with the container
+            os.fchmod(f.fileno(), 0o644)
+            futures[executor.submit(dump, source, category, begin, end, f)] = f
+
+        for future in as_completed(futures):
+            future.result()
+            ingest(futures[future].name)
     restart_prometheus()
 
 